@@ -2,36 +2,52 @@
 Paper-02: Regime comparison charts — PLN (NBP) vs EUR (ECB).
 Main 6-panel time series for 3 BDP levels, each comparing both regimes.
 """
+import os
+
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.patches import Patch
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from regime_io import PIL_KWARGS, load_term, load_ts
 
 plt.rcParams.update({
     'font.size': 10, 'axes.titlesize': 11, 'axes.labelsize': 10,
     'xtick.labelsize': 9, 'ytick.labelsize': 9, 'legend.fontsize': 8,
     'figure.dpi': 200, 'savefig.dpi': 200, 'savefig.bbox': 'tight',
+    'path.simplify': True, 'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
 })
 
 ROOT = Path(__file__).parent.parent.parent
 OUT_DIR = ROOT / "figures"
 OUT_DIR.mkdir(exist_ok=True)
 
-def load_ts(regime, bdp):
-    """Load timeseries CSV for given regime and BDP level."""
-    d = ROOT / "simulations" / "results" / regime
-    prefix = f"sweep_{regime}_{bdp}"
-    return pd.read_csv(d / f"{prefix}_timeseries.csv", sep=";", decimal=",")
-
-def load_term(regime, bdp):
-    """Load terminal CSV for given regime and BDP level."""
-    d = ROOT / "simulations" / "results" / regime
-    prefix = f"sweep_{regime}_{bdp}"
-    return pd.read_csv(d / f"{prefix}_terminal.csv", sep=";", decimal=",")
-
 BDP_SHOW = [0, 2000, 3000]
 BDP_LABELS = ['UBI = 0', 'UBI = 2,000', 'UBI = 3,000']
 
+def load_bundle():
+    """Load every frame the figures and summary need, keyed by (regime, bdp).
+
+    Missing files are reported here and simply left out of the bundle.
+    """
+    bundle = {'ts': {}, 'term': {}}
+    for bdp in BDP_SHOW:
+        for regime in ['pln', 'eur']:
+            try:
+                bundle['ts'][(regime, bdp)] = load_ts(regime, bdp)
+            except FileNotFoundError as e:
+                print(f"Missing data for BDP={bdp}: {e}")
+            try:
+                bundle['term'][(regime, bdp)] = load_term(regime, bdp)
+            except FileNotFoundError as e:
+                print(f"Missing data for BDP={bdp}: {e}")
+    return bundle
+
 # ═══════════════════════════════════════════════════════════════
 # FIGURE 1: 6-panel comparison (3 cols = BDP levels, 2 rows = metrics)
 #           Each panel: PLN line vs EUR line with CI bands
@@ -49,63 +65,70 @@ METRICS = [
 PLN_COLOR = '#2196F3'
 EUR_COLOR = '#E91E63'
 
-fig, axes = plt.subplots(3, 3, figsize=(15, 12))
-
-for col_idx, (bdp, bdp_label) in enumerate(zip(BDP_SHOW, BDP_LABELS)):
-    try:
-        ts_pln = load_ts("pln", bdp)
-        ts_eur = load_ts("eur", bdp)
-    except FileNotFoundError as e:
-        print(f"Missing data for BDP={bdp}: {e}")
-        continue
+def ci_bands(ts, metrics):
+    """Scaled (mean, p05, p95) arrays of a timeseries frame, keyed by metric."""
+    return {col_base: tuple(ts[f"{col_base}_{stat}"].to_numpy() * mult
+                            for stat in ("mean", "p05", "p95"))
+            for col_base, _, mult, *_ in metrics}
 
-    months = ts_pln["Month"].values
-
-    panel_metrics = [
-        ("Inflation",     "Inflation (%)",           100, 0),
-        ("TotalAdoption", "Adoption (%)",            100, 0),
-        ("Unemployment",  "Unemployment (%)",        100, 0),
-    ]
-
-    for row_idx, (col_base, ylabel, mult, hline) in enumerate(panel_metrics):
-        ax = axes[row_idx, col_idx]
-
-        for ts, color, label in [(ts_pln, PLN_COLOR, 'PLN (NBP)'),
-                                  (ts_eur, EUR_COLOR, 'EUR (ECB)')]:
-            mean = ts[f"{col_base}_mean"].values * mult
-            p05 = ts[f"{col_base}_p05"].values * mult
-            p95 = ts[f"{col_base}_p95"].values * mult
-            ax.plot(months, mean, color=color, linewidth=1.5, label=label)
-            ax.fill_between(months, p05, p95, color=color, alpha=0.12)
+panel_metrics = [
+    ("Inflation",     "Inflation (%)",           100, 0),
+    ("TotalAdoption", "Adoption (%)",            100, 0),
+    ("Unemployment",  "Unemployment (%)",        100, 0),
+]
 
-        ax.axvline(x=30, color='gray', linestyle='--', linewidth=0.8, alpha=0.5)
-        if hline is not None:
-            ax.axhline(y=hline, color='gray', linestyle=':', linewidth=0.5)
-        ax.set_xlim(1, 120)
-
-        if row_idx == 0:
-            ax.set_title(bdp_label, fontweight='bold', fontsize=12)
-        if col_idx == 0:
-            ax.set_ylabel(ylabel)
-        if row_idx == 2:
-            ax.set_xlabel("Month")
-        if row_idx == 0 and col_idx == 2:
-            ax.legend(loc='upper right', framealpha=0.9)
 
-fig.suptitle("Monetary Regime Comparison: PLN vs EUR (bands = 90% CI)",
-             fontsize=14, fontweight='bold', y=1.01)
-fig.tight_layout()
-fig.savefig(OUT_DIR / "p02_regime_timeseries.png")
-print("Saved: p02_regime_timeseries.png")
-plt.close()
+def build_fig1(bundle):
+    """Figure 1: 3×3 time series, columns = BDP levels, rows = metrics."""
+    fig, axes = plt.subplots(3, 3, figsize=(15, 12), sharex=True, sharey='row')
+    plt.setp(axes, xlim=(1, 120))
+
+    for col_idx, (bdp, bdp_label) in enumerate(zip(BDP_SHOW, BDP_LABELS)):
+        ts_pln = bundle['ts'].get(("pln", bdp))
+        ts_eur = bundle['ts'].get(("eur", bdp))
+        if ts_pln is None or ts_eur is None:
+            continue
+
+        months = ts_pln["Month"].to_numpy()
+        cols_pln = ci_bands(ts_pln, panel_metrics)
+        cols_eur = ci_bands(ts_eur, panel_metrics)
+
+        for row_idx, (col_base, ylabel, mult, hline) in enumerate(panel_metrics):
+            ax = axes[row_idx, col_idx]
+
+            for cols, color, label in [(cols_pln, PLN_COLOR, 'PLN (NBP)'),
+                                        (cols_eur, EUR_COLOR, 'EUR (ECB)')]:
+                mean, p05, p95 = cols[col_base]
+                ax.plot(months, mean, color=color, linewidth=1.5, label=label)
+                ax.fill_between(months, p05, p95, color=color, alpha=0.12,
+                                rasterized=True)
+
+            ax.axvline(x=30, color='gray', linestyle='--', linewidth=0.8, alpha=0.5)
+            if hline is not None:
+                ax.axhline(y=hline, color='gray', linestyle=':', linewidth=0.5)
+
+            if row_idx == 0:
+                ax.set_title(bdp_label, fontweight='bold', fontsize=12)
+            if col_idx == 0:
+                ax.set_ylabel(ylabel)
+            if row_idx == 2:
+                ax.set_xlabel("Month")
+            if row_idx == 0 and col_idx == 2:
+                ax.legend(loc='upper right', framealpha=0.9)
+
+    fig.suptitle("Monetary Regime Comparison: PLN vs EUR (bands = 90% CI)",
+                 fontsize=14, fontweight='bold', y=1.01)
+    fig.tight_layout()
+    out = OUT_DIR / "p02_regime_timeseries.png"
+    fig.savefig(out, pil_kwargs=PIL_KWARGS)
+    plt.close(fig)
+    return out
 
 
 # ═══════════════════════════════════════════════════════════════
 # FIGURE 2: 2×3 detail panels — ExRate, RefRate, NPL, Wage, Debt, PriceLevel
 # ═══════════════════════════════════════════════════════════════
 
-fig, axes = plt.subplots(2, 3, figsize=(15, 8))
-
 detail_metrics = [
     ("ExRate",     "Exchange rate (PLN/EUR)",  1),
     ("RefRate",    "Central bank rate (%)",   100),
@@ -116,25 +139,33 @@ detail_metrics = [
 ]
 
 # Use BDP=2000 as the main comparison
-bdp = 2000
-try:
-    ts_pln = load_ts("pln", bdp)
-    ts_eur = load_ts("eur", bdp)
-    months = ts_pln["Month"].values
+DETAIL_BDP = 2000
+
+def build_fig2(bundle):
+    """Figure 2: six monetary channels at DETAIL_BDP (None if data missing)."""
+    ts_pln = bundle['ts'].get(("pln", DETAIL_BDP))
+    ts_eur = bundle['ts'].get(("eur", DETAIL_BDP))
+    if ts_pln is None or ts_eur is None:
+        return None
+
+    fig, axes = plt.subplots(2, 3, figsize=(15, 8), sharex=True)
+    plt.setp(axes, xlim=(1, 120))
+
+    months = ts_pln["Month"].to_numpy()
+    cols_pln = ci_bands(ts_pln, detail_metrics)
+    cols_eur = ci_bands(ts_eur, detail_metrics)
 
     for idx, (col_base, ylabel, mult) in enumerate(detail_metrics):
         ax = axes[idx // 3, idx % 3]
-        for ts, color, label in [(ts_pln, PLN_COLOR, 'PLN'),
-                                  (ts_eur, EUR_COLOR, 'EUR')]:
-            mean = ts[f"{col_base}_mean"].values * mult
-            p05 = ts[f"{col_base}_p05"].values * mult
-            p95 = ts[f"{col_base}_p95"].values * mult
+        for cols, color, label in [(cols_pln, PLN_COLOR, 'PLN'),
+                                    (cols_eur, EUR_COLOR, 'EUR')]:
+            mean, p05, p95 = cols[col_base]
             ax.plot(months, mean, color=color, linewidth=1.5, label=label)
-            ax.fill_between(months, p05, p95, color=color, alpha=0.12)
+            ax.fill_between(months, p05, p95, color=color, alpha=0.12,
+                            rasterized=True)
 
         ax.axvline(x=30, color='gray', linestyle='--', linewidth=0.8, alpha=0.5)
         ax.set_ylabel(ylabel)
-        ax.set_xlim(1, 120)
         if idx >= 3:
             ax.set_xlabel("Month")
         if idx == 0:
@@ -143,70 +174,107 @@ try:
     fig.suptitle("Regime Detail: UBI = 2,000 PLN — PLN vs EUR (90% CI)",
                  fontsize=13, fontweight='bold', y=1.01)
     fig.tight_layout()
-    fig.savefig(OUT_DIR / "p02_regime_detail.png")
-    print("Saved: p02_regime_detail.png")
-except FileNotFoundError as e:
-    print(f"Skipping detail panel: {e}")
-plt.close()
+    out = OUT_DIR / "p02_regime_detail.png"
+    fig.savefig(out, pil_kwargs=PIL_KWARGS)
+    plt.close(fig)
+    return out
 
 
 # ═══════════════════════════════════════════════════════════════
-# FIGURE 3: Terminal scatter — adoption vs inflation phase space
+# FIGURE 3: Terminal density (hexbin) — adoption vs inflation phase space
 # ═══════════════════════════════════════════════════════════════
 
-fig, axes = plt.subplots(1, 3, figsize=(15, 4.5))
-
-for idx, (bdp, label) in enumerate(zip(BDP_SHOW, BDP_LABELS)):
-    ax = axes[idx]
-    try:
-        t_pln = load_term("pln", bdp)
-        t_eur = load_term("eur", bdp)
-
-        ax.scatter(t_pln['TotalAdoption']*100, t_pln['Inflation']*100,
-                   c=PLN_COLOR, marker='o', alpha=0.4, s=25, label='PLN')
-        ax.scatter(t_eur['TotalAdoption']*100, t_eur['Inflation']*100,
-                   c=EUR_COLOR, marker='s', alpha=0.4, s=25, label='EUR')
-    except FileNotFoundError:
-        pass
-
-    ax.axhline(y=0, color='gray', linewidth=0.5, linestyle=':')
-    ax.set_xlabel("Technology adoption (%)")
-    if idx == 0:
-        ax.set_ylabel("Inflation (%)")
-    ax.set_title(label, fontweight='bold')
-    if idx == 0:
-        ax.legend()
-
-fig.suptitle("Phase space: PLN vs EUR — adoption × inflation",
-             fontsize=12, fontweight='bold', y=1.02)
-fig.tight_layout()
-fig.savefig(OUT_DIR / "p02_regime_phasespace.png")
-print("Saved: p02_regime_phasespace.png")
-plt.close()
+def build_fig3(bundle):
+    """Figure 3: adoption × inflation terminal density per BDP level."""
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4.5))
+
+    for idx, (bdp, label) in enumerate(zip(BDP_SHOW, BDP_LABELS)):
+        ax = axes[idx]
+        t_pln = bundle['term'].get(("pln", bdp))
+        t_eur = bundle['term'].get(("eur", bdp))
+        if t_pln is not None and t_eur is not None:
+            # Common grid for both regimes; vmin=0 keeps single-seed bins visible
+            x = pd.concat([t_pln['TotalAdoption'], t_eur['TotalAdoption']]) * 100
+            y = pd.concat([t_pln['Inflation'], t_eur['Inflation']]) * 100
+            extent = (x.min(), x.max(), y.min(), y.max())
+            for t, cmap in [(t_pln, 'Blues'), (t_eur, 'Reds')]:
+                ax.hexbin(t['TotalAdoption']*100, t['Inflation']*100,
+                          gridsize=30, extent=extent, mincnt=1, vmin=0,
+                          cmap=cmap, alpha=0.6)
+
+        ax.axhline(y=0, color='gray', linewidth=0.5, linestyle=':')
+        ax.set_xlabel("Technology adoption (%)")
+        if idx == 0:
+            ax.set_ylabel("Inflation (%)")
+        ax.set_title(label, fontweight='bold')
+        if idx == 0:
+            ax.legend(handles=[Patch(color=PLN_COLOR, alpha=0.6, label='PLN'),
+                               Patch(color=EUR_COLOR, alpha=0.6, label='EUR')])
+
+    fig.suptitle("Phase space: PLN vs EUR — adoption × inflation",
+                 fontsize=12, fontweight='bold', y=1.02)
+    fig.tight_layout()
+    out = OUT_DIR / "p02_regime_phasespace.png"
+    fig.savefig(out, pil_kwargs=PIL_KWARGS)
+    plt.close(fig)
+    return out
 
 
 # ═══════════════════════════════════════════════════════════════
 # Summary table
 # ═══════════════════════════════════════════════════════════════
 
-print("\n" + "=" * 90)
-print("REGIME COMPARISON SUMMARY")
-print("=" * 90)
-print(f"{'BDP':>6s} {'Regime':>6s} | {'Adopt':>7s} {'±σ':>5s} | {'Infl':>7s} {'±σ':>5s} | "
-      f"{'Unemp':>7s} {'±σ':>5s} | {'ExRate':>7s} | {'RefRate':>7s}")
-print("-" * 90)
-
-for bdp in BDP_SHOW:
-    for regime in ['pln', 'eur']:
-        try:
-            df = load_term(regime, bdp)
+def print_summary(bundle):
+    print("\n" + "=" * 90)
+    print("REGIME COMPARISON SUMMARY")
+    print("=" * 90)
+    print(f"{'BDP':>6s} {'Regime':>6s} | {'Adopt':>7s} {'±σ':>5s} | {'Infl':>7s} {'±σ':>5s} | "
+          f"{'Unemp':>7s} {'±σ':>5s} | {'ExRate':>7s} | {'RefRate':>7s}")
+    print("-" * 90)
+
+    terminals = {(bdp, regime): df for (regime, bdp), df in bundle['term'].items()}
+    stats = pd.DataFrame()
+    if terminals:
+        stats = (pd.concat(terminals, names=['BDP', 'regime'])
+                   .groupby(level=['BDP', 'regime'])
+                   [['TotalAdoption', 'Inflation', 'Unemployment', 'ExRate', 'RefRate']]
+                   .agg(['mean', 'std']))
+
+    for bdp in BDP_SHOW:
+        for regime in ['pln', 'eur']:
+            if (bdp, regime) not in stats.index:
+                print(f"{bdp:6d} {regime:>6s} | (missing)")
+                continue
+            r = stats.loc[(bdp, regime)]
             print(f"{bdp:6d} {regime:>6s} | "
-                  f"{df.TotalAdoption.mean()*100:7.1f} {df.TotalAdoption.std()*100:5.1f} | "
-                  f"{df.Inflation.mean()*100:7.1f} {df.Inflation.std()*100:5.1f} | "
-                  f"{df.Unemployment.mean()*100:7.1f} {df.Unemployment.std()*100:5.1f} | "
-                  f"{df.ExRate.mean():7.2f} | "
-                  f"{df.RefRate.mean()*100:7.2f}%")
-        except FileNotFoundError:
-            print(f"{bdp:6d} {regime:>6s} | (missing)")
-
-print("\nDone!")
+                  f"{r['TotalAdoption', 'mean']*100:7.1f} {r['TotalAdoption', 'std']*100:5.1f} | "
+                  f"{r['Inflation', 'mean']*100:7.1f} {r['Inflation', 'std']*100:5.1f} | "
+                  f"{r['Unemployment', 'mean']*100:7.1f} {r['Unemployment', 'std']*100:5.1f} | "
+                  f"{r['ExRate', 'mean']:7.2f} | "
+                  f"{r['RefRate', 'mean']*100:7.2f}%")
+
+
+if __name__ == "__main__":
+    bundle = load_bundle()
+
+    # Figures share nothing but the loaded frames, so render them in
+    # separate processes while the summary is computed here. On a single
+    # core the worker start-up and bundle pickling only add time.
+    builders = (build_fig1, build_fig2, build_fig3)
+    if (os.cpu_count() or 1) < 2:
+        print_summary(bundle)
+        saved = [fn(bundle) for fn in builders]
+    else:
+        with ProcessPoolExecutor(max_workers=len(builders)) as pool:
+            futures = [pool.submit(fn, bundle) for fn in builders]
+            print_summary(bundle)
+            saved = [f.result() for f in futures]
+
+    print()
+    for out in saved:
+        if out is not None:
+            print(f"Saved: {out.name}")
+    if saved[1] is None:
+        print(f"Skipping detail panel: no timeseries for BDP={DETAIL_BDP}")
+
+    print("\nDone!")
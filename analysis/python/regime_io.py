@@ -0,0 +1,57 @@
+"""
+Paper-02: Shared loaders for the simulation result CSVs.
+Parsed frames are cached on disk (results/.cache/) and memoized per process.
+"""
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).parent.parent.parent
+RESULTS_DIR = ROOT / "simulations" / "results"
+CACHE_DIR = RESULTS_DIR / ".cache"
+CACHE_VERSION = 4  # bump when the parser or parsed dtypes change
+
+# PNG writer options for all figures. P02_FAST_PNG=1 saves with zlib level 1
+# for quicker local iteration (~25% larger files); committed figures use the
+# default compression.
+PIL_KWARGS = {'compress_level': 1} if os.environ.get("P02_FAST_PNG") else {}
+
+def _load(regime, bdp, kind):
+    """Read one result CSV, reusing its pickle while newer than the CSV."""
+    csv_path = RESULTS_DIR / regime / f"sweep_{regime}_{bdp}_{kind}.csv"
+    pkl_path = CACHE_DIR / f"{regime}_{bdp}_{kind}.v{CACHE_VERSION}.pkl"
+    if pkl_path.exists() and os.path.getmtime(pkl_path) >= os.path.getmtime(csv_path):
+        try:
+            return pd.read_pickle(pkl_path)
+        except (EOFError, pickle.UnpicklingError, ValueError, AttributeError):
+            pass  # damaged cache entry: re-parse the CSV and overwrite it
+    df = pd.read_csv(csv_path, sep=";", decimal=",")
+    # Write to a temp file and rename, so concurrent or interrupted runs
+    # never leave a truncated pickle under the final name
+    tmp_path = None
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, pkl_path)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+# The memoized frames are shared between callers — treat them as read-only.
+
+@lru_cache(maxsize=None)
+def load_ts(regime, bdp):
+    """Load timeseries CSV for given regime and BDP level."""
+    return _load(regime, bdp, "timeseries")
+
+@lru_cache(maxsize=None)
+def load_term(regime, bdp):
+    """Load terminal CSV for given regime and BDP level."""
+    return _load(regime, bdp, "terminal")
@@ -4,13 +4,20 @@ Overlays both regimes on same axes to show how critical point shifts.
 """
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from regime_io import PIL_KWARGS, load_term
 
 plt.rcParams.update({
     'font.size': 10, 'axes.titlesize': 11, 'axes.labelsize': 10,
     'xtick.labelsize': 9, 'ytick.labelsize': 9, 'legend.fontsize': 9,
     'figure.dpi': 200, 'savefig.dpi': 200, 'savefig.bbox': 'tight',
+    'path.simplify': True, 'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
 })
 
 ROOT = Path(__file__).parent.parent.parent
@@ -22,31 +29,53 @@ BDP_LEVELS = list(range(0, 5001, 250))
 PLN_COLOR = '#2196F3'
 EUR_COLOR = '#E91E63'
 
+# Sweep column -> (terminal CSV column, scale)
+SWEEP_COLS = {
+    'Adoption':     ('TotalAdoption', 100),
+    'Inflation':    ('Inflation',     100),
+    'Unemployment': ('Unemployment',  100),
+    'ExRate':       ('ExRate',          1),
+    'RefRate':      ('RefRate',       100),
+    'NPL':          ('NPL',           100),
+}
+
+def _load_bdp(regime, bdp):
+    """Load one terminal CSV of the sweep (None if missing)."""
+    try:
+        return load_term(regime, bdp)
+    except FileNotFoundError:
+        return None
+
 def load_sweep(regime):
     """Load all sweep terminal CSVs for a given regime."""
-    d = ROOT / "simulations" / "results" / regime
-    rows = []
-    for bdp in BDP_LEVELS:
-        fpath = d / f"sweep_{regime}_{bdp}_terminal.csv"
-        if not fpath.exists():
-            print(f"  MISSING: {fpath.name}")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(lambda bdp: _load_bdp(regime, bdp), BDP_LEVELS))
+    parts = []
+    for bdp, df in zip(BDP_LEVELS, frames):
+        if df is None:
+            print(f"  MISSING: sweep_{regime}_{bdp}_terminal.csv")
             continue
-        df = pd.read_csv(fpath, sep=";", decimal=",")
-        for _, row in df.iterrows():
-            eff_bdp = row.get('EffectiveBDP', bdp)
-            if pd.isna(eff_bdp):
-                eff_bdp = bdp
-            rows.append({
-                'BDP': bdp,
-                'Adoption': row['TotalAdoption'] * 100,
-                'Inflation': row['Inflation'] * 100,
-                'Unemployment': row['Unemployment'] * 100,
-                'ExRate': row['ExRate'],
-                'RefRate': row['RefRate'] * 100,
-                'NPL': row['NPL'] * 100,
-                'EffectiveBDP': eff_bdp,
-            })
-    return pd.DataFrame(rows)
+        parts.append((bdp, df))
+
+    # Fill preallocated columns slab by slab, then wrap them once
+    n = sum(len(df) for _, df in parts)
+    out = {'BDP': np.empty(n, dtype=np.int32)}
+    for col in SWEEP_COLS:
+        out[col] = np.empty(n, dtype=np.float32)
+    out['EffectiveBDP'] = np.empty(n, dtype=np.float32)
+
+    start = 0
+    for bdp, df in parts:
+        stop = start + len(df)
+        out['BDP'][start:stop] = bdp
+        for col, (src, scale) in SWEEP_COLS.items():
+            out[col][start:stop] = df[src].to_numpy() * scale
+        if 'EffectiveBDP' in df.columns:
+            out['EffectiveBDP'][start:stop] = df['EffectiveBDP'].fillna(bdp).to_numpy()
+        else:
+            out['EffectiveBDP'][start:stop] = bdp
+        start = stop
+    return pd.DataFrame(out)
 
 print("Loading PLN sweep...")
 data_pln = load_sweep("pln")
@@ -56,6 +85,24 @@ print("Loading EUR sweep...")
 data_eur = load_sweep("eur")
 print(f"  {len(data_eur)} datapoints")
 
+# Per-BDP mean/std shared by every figure and the summary below
+AGG_COLS = ['Adoption', 'Inflation', 'Unemployment']
+
+def bdp_stats(data):
+    """Per-BDP mean and std of the plotted sweep columns."""
+    if data.empty:
+        return pd.DataFrame()
+    return data.groupby('BDP')[AGG_COLS].agg(['mean', 'std'])
+
+def critical_point(agg):
+    """BDP level with the largest adoption σ, and that σ."""
+    stds = agg[('Adoption', 'std')].to_numpy()
+    i = np.nanargmax(stds)
+    return agg.index[i], stds[i]
+
+agg_pln = bdp_stats(data_pln)
+agg_eur = bdp_stats(data_eur)
+
 
 # ═══════════════════════════════════════════════════════════════
 # FIGURE 1: 2×2 bifurcation comparison
@@ -64,17 +111,17 @@ print(f"  {len(data_eur)} datapoints")
 fig, axes = plt.subplots(2, 2, figsize=(12, 9))
 
 def plot_bifurcation(ax, col, ylabel, title):
-    for data, color, label in [(data_pln, PLN_COLOR, 'PLN (NBP)'),
-                                (data_eur, EUR_COLOR, 'EUR (ECB)')]:
+    for data, agg, color, label in [(data_pln, agg_pln, PLN_COLOR, 'PLN (NBP)'),
+                                     (data_eur, agg_eur, EUR_COLOR, 'EUR (ECB)')]:
         if data.empty:
             continue
-        ax.scatter(data['BDP'], data[col], c=color, alpha=0.15, s=10, edgecolor='none')
-        means = data.groupby('BDP')[col].agg(['mean', 'std'])
-        ax.plot(means.index, means['mean'], color=color, linewidth=2.5,
+        ax.scatter(data['BDP'], data[col], c=color, alpha=0.15, s=10, edgecolor='none',
+                   rasterized=True)
+        mean, std = agg[(col, 'mean')], agg[(col, 'std')]
+        ax.plot(agg.index, mean, color=color, linewidth=2.5,
                 label=label, zorder=5)
-        ax.fill_between(means.index, means['mean'] - means['std'],
-                         means['mean'] + means['std'],
-                         color=color, alpha=0.1)
+        ax.fill_between(agg.index, mean - std, mean + std,
+                         color=color, alpha=0.1, rasterized=True)
     ax.set_xlabel("UBI (PLN/month)")
     ax.set_ylabel(ylabel)
     ax.set_title(title, fontweight='bold')
@@ -92,19 +139,17 @@ plot_bifurcation(axes[1, 1], 'Unemployment',
 
 # Panel C: Variance comparison — critical point signature
 ax = axes[1, 0]
-for data, color, label in [(data_pln, PLN_COLOR, 'PLN'),
-                            (data_eur, EUR_COLOR, 'EUR')]:
-    if data.empty:
+for agg, color, label in [(agg_pln, PLN_COLOR, 'PLN'),
+                           (agg_eur, EUR_COLOR, 'EUR')]:
+    if agg.empty:
         continue
-    stds = data.groupby('BDP')['Adoption'].std()
-    ax.plot(stds.index, stds.values, color=color, linewidth=2.5,
+    ax.plot(agg.index, agg[('Adoption', 'std')], color=color, linewidth=2.5,
             marker='o', markersize=4, label=label)
     # Mark critical point
-    if not stds.empty:
-        cp = stds.idxmax()
-        ax.axvline(x=cp, color=color, linestyle='--', alpha=0.4, linewidth=1)
-        ax.annotate(f'{cp}', (cp, stds[cp]), textcoords="offset points",
-                    xytext=(8, 5), fontsize=8, color=color, fontweight='bold')
+    cp, cp_std = critical_point(agg)
+    ax.axvline(x=cp, color=color, linestyle='--', alpha=0.4, linewidth=1)
+    ax.annotate(f'{cp}', (cp, cp_std), textcoords="offset points",
+                xytext=(8, 5), fontsize=8, color=color, fontweight='bold')
 
 ax.set_xlabel("UBI (PLN/month)")
 ax.set_ylabel("σ of adoption (%)")
@@ -114,7 +159,7 @@ ax.legend()
 fig.suptitle("Bifurcation: PLN vs EUR — sweep 0–5,000 PLN (30 seeds × 21 points)",
              fontsize=13, fontweight='bold', y=1.01)
 fig.tight_layout()
-fig.savefig(OUT_DIR / "p02_bifurcation_comparison.png")
+fig.savefig(OUT_DIR / "p02_bifurcation_comparison.png", pil_kwargs=PIL_KWARGS)
 print("\nSaved: p02_bifurcation_comparison.png")
 plt.close()
 
@@ -125,18 +170,22 @@ plt.close()
 
 fig, axes = plt.subplots(1, 3, figsize=(14, 4.5))
 
+# EUR − PLN per-BDP means, aligned on BDP in one subtraction
+mean_diff = pd.DataFrame()
+if not data_pln.empty and not data_eur.empty:
+    mean_diff = (agg_eur.xs('mean', axis=1, level=1)
+                 - agg_pln.xs('mean', axis=1, level=1)).dropna()
+
 for idx, (col, ylabel, title) in enumerate([
     ('Adoption', 'Δ Adoption (pp)', 'A. Adoption difference'),
     ('Inflation', 'Δ Inflation (pp)', 'B. Inflation difference'),
     ('Unemployment', 'Δ Unemployment (pp)', 'C. Unemployment difference'),
 ]):
     ax = axes[idx]
-    if not data_pln.empty and not data_eur.empty:
-        m_pln = data_pln.groupby('BDP')[col].mean()
-        m_eur = data_eur.groupby('BDP')[col].mean()
-        common = m_pln.index.intersection(m_eur.index)
-        diff = m_eur.loc[common] - m_pln.loc[common]
-        ax.bar(common, diff, width=200, color=['#4CAF50' if d > 0 else '#F44336' for d in diff],
+    if not mean_diff.empty:
+        diff = mean_diff[col].to_numpy()
+        ax.bar(mean_diff.index, diff, width=200,
+               color=np.where(diff > 0, '#4CAF50', '#F44336'),
                alpha=0.7, edgecolor='white')
     ax.axhline(y=0, color='black', linewidth=0.8)
     ax.set_xlabel("UBI (PLN/month)")
@@ -146,7 +195,7 @@ for idx, (col, ylabel, title) in enumerate([
 fig.suptitle("EUR − PLN difference across UBI sweep",
              fontsize=12, fontweight='bold', y=1.02)
 fig.tight_layout()
-fig.savefig(OUT_DIR / "p02_regime_difference.png")
+fig.savefig(OUT_DIR / "p02_regime_difference.png", pil_kwargs=PIL_KWARGS)
 print("Saved: p02_regime_difference.png")
 plt.close()
 
@@ -164,25 +213,24 @@ print(f"{'BDP':>6s} | {'PLN Adopt':>9s} {'±σ':>5s} {'EUR Adopt':>9s} {'±σ':>
       f"{'EUR EffBDP':>10s}")
 print("-" * 115)
 
+eff_eur = data_eur.groupby('BDP')['EffectiveBDP'].mean() if not data_eur.empty else pd.Series()
+
 for bdp in BDP_LEVELS:
-    pln_sub = data_pln[data_pln['BDP'] == bdp]
-    eur_sub = data_eur[data_eur['BDP'] == bdp]
-    if pln_sub.empty or eur_sub.empty:
+    if bdp not in agg_pln.index or bdp not in agg_eur.index:
         continue
-    eur_eff = eur_sub['EffectiveBDP'].mean() if 'EffectiveBDP' in eur_sub.columns else bdp
+    p, e = agg_pln.loc[bdp], agg_eur.loc[bdp]
     print(f"{bdp:6d} | "
-          f"{pln_sub.Adoption.mean():9.1f} {pln_sub.Adoption.std():5.1f} "
-          f"{eur_sub.Adoption.mean():9.1f} {eur_sub.Adoption.std():5.1f} | "
-          f"{pln_sub.Inflation.mean():9.1f} {eur_sub.Inflation.mean():9.1f} | "
-          f"{pln_sub.Unemployment.mean():9.1f} {eur_sub.Unemployment.mean():9.1f} | "
-          f"{eur_eff:10.0f}")
+          f"{p['Adoption', 'mean']:9.1f} {p['Adoption', 'std']:5.1f} "
+          f"{e['Adoption', 'mean']:9.1f} {e['Adoption', 'std']:5.1f} | "
+          f"{p['Inflation', 'mean']:9.1f} {e['Inflation', 'mean']:9.1f} | "
+          f"{p['Unemployment', 'mean']:9.1f} {e['Unemployment', 'mean']:9.1f} | "
+          f"{eff_eur[bdp]:10.0f}")
 
 # Critical points
-for data, label in [(data_pln, 'PLN'), (data_eur, 'EUR')]:
-    if data.empty:
+for agg, label in [(agg_pln, 'PLN'), (agg_eur, 'EUR')]:
+    if agg.empty:
         continue
-    stds = data.groupby('BDP')['Adoption'].std()
-    cp = stds.idxmax()
-    print(f"\nCritical point ({label}): BDP = {cp} PLN  (σ_adopt = {stds[cp]:.1f}%)")
+    cp, cp_std = critical_point(agg)
+    print(f"\nCritical point ({label}): BDP = {cp} PLN  (σ_adopt = {cp_std:.1f}%)")
 
 print("\nDone!")
@@ -4,13 +4,20 @@ Real consumption, Gini coefficient, Pareto frontier.
 """
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from functools import lru_cache
 from pathlib import Path
 
+from regime_io import PIL_KWARGS, load_term
+
 plt.rcParams.update({
     'font.size': 10, 'axes.titlesize': 11, 'axes.labelsize': 10,
     'xtick.labelsize': 9, 'ytick.labelsize': 9, 'legend.fontsize': 9,
     'figure.dpi': 200, 'savefig.dpi': 200, 'savefig.bbox': 'tight',
+    'path.simplify': True, 'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
 })
 
 ROOT = Path(__file__).parent.parent.parent
@@ -25,48 +32,63 @@ MPC = 0.82
 
 BDP_LEVELS = list(range(0, 5001, 250))
 
-def load_term(regime, bdp):
-    d = ROOT / "simulations" / "results" / regime
-    return pd.read_csv(d / f"sweep_{regime}_{bdp}_terminal.csv", sep=";", decimal=",")
+# The numba-compiled path only pays back its import and JIT compile on very large
+# frames; the shipped terminal files have a few hundred rows per level.
+NUMBA_MIN_ROWS = 1_000_000
+
+def _welfare(unemp, wage, price, actual_bdp):
+    """Real consumption per capita and binary-income Gini, one entry per seed.
+    Written in the NumPy subset numba compiles, so both paths share it.
+    """
+    n_emp = ((1 - unemp) * POPULATION).astype(np.int64)
+    n_unemp = POPULATION - n_emp
+
+    y_emp = wage + actual_bdp
+    y_unemp = actual_bdp
+
+    total_income = n_emp * y_emp + n_unemp * y_unemp
+    real_cons_pc = total_income * MPC / price / POPULATION
+
+    # Gini (binary income: employed vs unemployed); 0 where undefined
+    num = n_emp * n_unemp * np.abs(y_emp - y_unemp)
+    defined = (total_income > 0) & (n_emp > 0) & (n_unemp > 0)
+    gini = np.where(defined, num / np.where(defined, POPULATION * total_income, 1.0), 0.0)
+    return real_cons_pc, gini
+
+@lru_cache(maxsize=None)
+def _welfare_jit():
+    """numba-compiled _welfare, or plain _welfare without numba."""
+    try:
+        from numba import njit
+    except ImportError:  # optional
+        return _welfare
+    return njit(cache=True)(_welfare)
 
 def compute_welfare(df, bdp_amount):
     """Compute welfare metrics per seed.
     Uses EffectiveBDP from simulation (after SGP fiscal constraint) if available,
     otherwise falls back to legislated bdp_amount.
     """
-    rows = []
-    for _, r in df.iterrows():
-        unemp = r['Unemployment']
-        wage = r['MarketWage']
-        price = r['PriceLevel']
-        n_emp = int((1 - unemp) * POPULATION)
-        n_unemp = POPULATION - n_emp
-
-        # Use actual BDP delivered (after SGP constraint) if available
-        actual_bdp = r.get('EffectiveBDP', bdp_amount)
-        if pd.isna(actual_bdp):
-            actual_bdp = bdp_amount
-
-        y_emp = wage + actual_bdp
-        y_unemp = actual_bdp
-
-        total_income = n_emp * y_emp + n_unemp * y_unemp
-        real_consumption = total_income * MPC / max(0.01, price)
-        real_cons_pc = real_consumption / POPULATION
-
-        # Gini (binary income: employed vs unemployed)
-        if total_income > 0 and n_emp > 0 and n_unemp > 0:
-            gini = (n_emp * n_unemp * abs(y_emp - y_unemp)) / (POPULATION * total_income)
-        else:
-            gini = 0.0
-
-        rows.append({
-            'real_cons_pc': real_cons_pc,
-            'gini': gini,
-            'adoption': r['TotalAdoption'] * 100,
-            'unemployment': unemp * 100,
-        })
-    return pd.DataFrame(rows)
+    unemp = df['Unemployment'].to_numpy(dtype=np.float64)
+    wage = df['MarketWage'].to_numpy(dtype=np.float64)
+    price = np.maximum(df['PriceLevel'].to_numpy(dtype=np.float64), 0.01)
+
+    # Use actual BDP delivered (after SGP constraint) if available
+    if 'EffectiveBDP' in df.columns:
+        actual_bdp = df['EffectiveBDP'].fillna(bdp_amount).to_numpy(dtype=np.float64)
+    else:
+        actual_bdp = np.full(len(df), bdp_amount, dtype=np.float64)
+
+    welfare_fn = _welfare_jit() if len(df) >= NUMBA_MIN_ROWS else _welfare
+    real_cons_pc, gini = welfare_fn(unemp, wage, price, actual_bdp)
+
+    # Income sums above need float64; the per-seed results do not
+    return pd.DataFrame({
+        'real_cons_pc': real_cons_pc.astype(np.float32),
+        'gini': gini.astype(np.float32),
+        'adoption': (df['TotalAdoption'].to_numpy() * 100).astype(np.float32),
+        'unemployment': (unemp * 100).astype(np.float32),
+    })
 
 # ═══════════════════════════════════════════════════════════════
 # Compute welfare for all BDP × regime combinations
@@ -92,6 +114,10 @@ for bdp in BDP_LEVELS:
             pass
 
 wdf = pd.DataFrame(welfare)
+# Categorical regime: the masks below compare 1-byte codes, not strings
+wdf['Regime'] = pd.Categorical(wdf['Regime'], categories=['PLN', 'EUR'])
+wdf['BDP'] = wdf['BDP'].astype('int16')
+wdf = wdf.astype({c: 'float32' for c in wdf.select_dtypes('float64').columns})
 pln = wdf[wdf['Regime'] == 'PLN']
 eur = wdf[wdf['Regime'] == 'EUR']
 
@@ -114,7 +140,7 @@ for df, color, label in [(pln, PLN_COLOR, 'PLN'), (eur, EUR_COLOR, 'EUR')]:
     ax.fill_between(df['BDP'],
                      df['RealConsPc_mean'] - df['RealConsPc_std'],
                      df['RealConsPc_mean'] + df['RealConsPc_std'],
-                     color=color, alpha=0.15)
+                     color=color, alpha=0.15, rasterized=True)
 ax.set_xlabel("UBI (PLN/month)")
 ax.set_ylabel("Real consumption per capita (PLN)")
 ax.set_title("A. Real consumption", fontweight='bold')
@@ -130,7 +156,7 @@ for df, color, label in [(pln, PLN_COLOR, 'PLN'), (eur, EUR_COLOR, 'EUR')]:
     ax.fill_between(df['BDP'],
                      df['Gini_mean'] - df['Gini_std'],
                      df['Gini_mean'] + df['Gini_std'],
-                     color=color, alpha=0.15)
+                     color=color, alpha=0.15, rasterized=True)
 ax.set_xlabel("UBI (PLN/month)")
 ax.set_ylabel("Gini coefficient")
 ax.set_title("B. Inequality", fontweight='bold')
@@ -145,7 +171,7 @@ for df, color, label, marker in [(pln, PLN_COLOR, 'PLN', 'o'),
     ax.scatter(df['RealConsPc_mean'], df['Gini_mean'],
                c=df['BDP'], cmap='viridis', marker=marker,
                s=60, alpha=0.8, edgecolor=color, linewidth=1.5,
-               label=label)
+               label=label, rasterized=True)
     # Connect dots in order
     ax.plot(df['RealConsPc_mean'], df['Gini_mean'],
             color=color, linewidth=1, alpha=0.4, linestyle='--')
@@ -185,7 +211,7 @@ if not bdp2k_pln.empty and not bdp2k_eur.empty:
 fig.suptitle("Welfare Analysis: PLN vs EUR",
              fontsize=13, fontweight='bold', y=1.01)
 fig.tight_layout()
-fig.savefig(OUT_DIR / "p02_welfare_comparison.png")
+fig.savefig(OUT_DIR / "p02_welfare_comparison.png", pil_kwargs=PIL_KWARGS)
 print("Saved: p02_welfare_comparison.png")
 plt.close()
 